@@ -7,6 +7,22 @@ const API_BASE = "http://localhost:8080";
 const WS_BASE = "ws://localhost:8080";
 
 const USERS_KEY = "knownUsers";
+const PAGE_SIZE = 1000;
+
+// list endpoints are keyset-paginated: follow the cursor header until the last page
+async function fetchAllPages(path, cursorParam, cursorHeader) {
+  const rows = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+    if (cursor !== null) params.set(cursorParam, cursor);
+    const res = await fetch(`${API_BASE}${path}?${params}`);
+    if (!res.ok) throw new Error(await res.text());
+    rows.push(...(await res.json()));
+    cursor = res.headers.get(cursorHeader);
+  } while (cursor !== null);
+  return rows;
+}
 
 function readKnownUsers() {
   try {
@@ -389,9 +405,7 @@ function HistoryPage() {
   async function loadOrders(showToast = true) {
     try {
       setLoading(true);
-      const res = await fetch(`${API_BASE}/orders/orders`);
-      if (!res.ok) throw new Error(await res.text());
-      const data = await res.json();
+      const data = await fetchAllPages("/orders/orders", "after_id", "X-Next-After-Id");
       setOrders(data);
 
       if (showToast) toast.info(`Загружено заказов: ${data.length}`, { toastId: "orders_loaded" });
@@ -463,9 +477,7 @@ function UsersPage() {
   async function loadUsers() {
     try {
       setLoading(true);
-      const res = await fetch(`${API_BASE}/payments/accounts`);
-      if (!res.ok) throw new Error(await res.text());
-      const data = await res.json();
+      const data = await fetchAllPages("/payments/accounts", "after_user_id", "X-Next-After-User-Id");
       setRows(data);
       toast.info(`Загружено пользователей: ${data.length}`, { toastId: "users_loaded" });
     } catch (e) {
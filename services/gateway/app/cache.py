@@ -0,0 +1,107 @@
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+
+# upstream name -> (path pattern, ttl seconds) for idempotent GETs worth caching
+CACHE_ROUTES: dict[str, list[tuple[re.Pattern, float]]] = {
+    "orders": [
+        (re.compile(r"^orders/\d+$"), float(os.getenv("ORDER_CACHE_TTL", "5"))),
+    ],
+    "payments": [
+        (re.compile(r"^accounts/\d+/balance$"), float(os.getenv("BALANCE_CACHE_TTL", "0.5"))),
+    ],
+}
+
+# headers that describe the upstream encoding, not the decoded body we keep
+ENCODING_HEADERS = {"content-encoding", "content-length"}
+
+
+def cache_key(upstream: str, path: str) -> str:
+    return f"{upstream}/{path}"
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._generation = 0
+
+    def ttl_for(self, upstream: str, path: str) -> float | None:
+        for pattern, ttl in CACHE_ROUTES.get(upstream, []):
+            if pattern.match(path):
+                return ttl
+        return None
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return response
+
+    def _store(self, key: str, response: CachedResponse, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, response)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[CachedResponse]],
+    ) -> CachedResponse:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, ttl, fetch))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        # a caller going away must not cancel the fetch the others share
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[CachedResponse]],
+    ) -> CachedResponse:
+        generation = self._generation
+        try:
+            response = await fetch()
+        finally:
+            self._inflight.pop(key, None)
+
+        if response.status_code == 200 and generation == self._generation:
+            self._store(key, response, ttl)
+        return response
+
+    def invalidate(self, key: str):
+        self._generation += 1
+        self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str):
+        self._generation += 1
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
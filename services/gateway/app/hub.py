@@ -0,0 +1,118 @@
+import asyncio
+import os
+from collections import OrderedDict, defaultdict
+
+from fastapi import WebSocket
+
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "100"))
+SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+LAST_STATUS_SIZE = int(os.getenv("WS_LAST_STATUS_SIZE", "100000"))
+
+
+class Subscriber:
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self.closed = False
+        self._pending: OrderedDict[int, dict] = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def offer(self, order_id: int, message: dict) -> bool:
+        if self.closed:
+            return False
+        # only the latest status of an order matters, so a queued one is replaced
+        self._pending.pop(order_id, None)
+        self._pending[order_id] = message
+        if len(self._pending) > self.maxsize:
+            self.close()
+            return False
+        self._ready.set()
+        return True
+
+    async def next_batch(self) -> list[dict]:
+        await self._ready.wait()
+        self._ready.clear()
+        batch = list(self._pending.values())
+        self._pending.clear()
+        return batch
+
+    def close(self):
+        self.closed = True
+        self._pending.clear()
+        self._ready.set()
+
+
+class Hub:
+    def __init__(self, last_status_size: int = LAST_STATUS_SIZE):
+        self.by_order: dict[int, set[Subscriber]] = defaultdict(set)
+        self.by_user: dict[int, set[Subscriber]] = defaultdict(set)
+        self.last_status_size = last_status_size
+        self.last_status: OrderedDict[int, dict] = OrderedDict()
+
+    def subscribe(self, order_id: int, sub: Subscriber):
+        self.by_order[order_id].add(sub)
+        # the status may have changed before the client got here
+        message = self.last_status.get(order_id)
+        if message is not None:
+            self.last_status.move_to_end(order_id)
+            sub.offer(order_id, message)
+
+    def _remember(self, order_id: int, message: dict):
+        self.last_status[order_id] = message
+        self.last_status.move_to_end(order_id)
+        while len(self.last_status) > self.last_status_size:
+            self.last_status.popitem(last=False)
+
+    def unsubscribe(self, order_id: int, sub: Subscriber):
+        _discard(self.by_order, order_id, sub)
+
+    def subscribe_user(self, user_id: int, sub: Subscriber):
+        self.by_user[user_id].add(sub)
+
+    def unsubscribe_user(self, user_id: int, sub: Subscriber):
+        _discard(self.by_user, user_id, sub)
+
+    def detach(self, sub: Subscriber, order_ids: set[int], user_id: int | None = None):
+        for order_id in order_ids:
+            self.unsubscribe(order_id, sub)
+        if user_id is not None:
+            self.unsubscribe_user(user_id, sub)
+        sub.close()
+
+    def publish(self, order_id: int, message: dict, user_id: int | None = None) -> int:
+        self._remember(order_id, message)
+        subs = set(self.by_order.get(order_id, ()))
+        if user_id is not None:
+            subs.update(self.by_user.get(user_id, ()))
+
+        delivered = 0
+        for sub in subs:
+            if sub.offer(order_id, message):
+                delivered += 1
+            else:
+                self.unsubscribe(order_id, sub)
+                if user_id is not None:
+                    self.unsubscribe_user(user_id, sub)
+        return delivered
+
+
+def _discard(index: dict[int, set[Subscriber]], key: int, sub: Subscriber):
+    subs = index.get(key)
+    if subs is None:
+        return
+    subs.discard(sub)
+    if not subs:
+        index.pop(key, None)
+
+
+async def ws_writer(ws: WebSocket, sub: Subscriber):
+    try:
+        while not sub.closed:
+            for message in await sub.next_batch():
+                await asyncio.wait_for(ws.send_json(message), SEND_TIMEOUT)
+    except Exception:
+        sub.close()
+
+    try:
+        await asyncio.wait_for(ws.close(code=1013), SEND_TIMEOUT)
+    except Exception:
+        pass
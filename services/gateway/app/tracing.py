@@ -0,0 +1,233 @@
+import json
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "gateway")
+TRACE_FILE = os.getenv("TRACE_FILE", "")
+TRACE_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", "")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+TRACE_FLUSH_INTERVAL = 1.0
+TRACE_BATCH_SIZE = 512
+
+TRACEPARENT_HEADER = "traceparent"
+UNTRACED_PATHS = frozenset({"/health", "/metrics"})
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    sampled: bool
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "service": SERVICE_NAME,
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+        }
+
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    if not value:
+        return None
+    match = TRACEPARENT_RE.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+
+
+def current_traceparent() -> str | None:
+    span = _current.get()
+    return span.traceparent if span is not None else None
+
+
+def inject(headers: dict) -> dict:
+    traceparent = current_traceparent()
+    if traceparent is not None:
+        headers = {k: v for k, v in headers.items() if k.lower() != TRACEPARENT_HEADER}
+        headers[TRACEPARENT_HEADER] = traceparent
+    return headers
+
+
+def begin_span(name: str, parent: str | None = None, **attributes) -> Span:
+    context = parse_traceparent(parent)
+    current = _current.get()
+    if context is None and current is not None:
+        context = (current.trace_id, current.span_id, current.sampled)
+    if context is not None:
+        trace_id, parent_id, sampled = context
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+        sampled = random.random() < TRACE_SAMPLE_RATE
+    return Span(
+        name=name,
+        trace_id=trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent_id,
+        sampled=sampled,
+        start_ns=time.time_ns(),
+        attributes=attributes,
+    )
+
+
+def end_span(span: Span, **attributes):
+    span.end_ns = time.time_ns()
+    span.attributes.update(attributes)
+    if span.sampled:
+        exporter.export(span)
+
+
+@contextmanager
+def start_span(name: str, parent: str | None = None, **attributes):
+    span = begin_span(name, parent, **attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.attributes["error"] = repr(e)
+        raise
+    finally:
+        _current.reset(token)
+        end_span(span)
+
+
+async def tracing_middleware(request, call_next):
+    if request.url.path in UNTRACED_PATHS:
+        return await call_next(request)
+    with start_span(
+        f"{request.method} {request.url.path}",
+        parent=request.headers.get(TRACEPARENT_HEADER),
+        **{"http.method": request.method},
+    ) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            span.name = f"{request.method} {route.path}"
+        span.attributes["http.status_code"] = response.status_code
+        return response
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> dict:
+    return {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "parentSpanId": span.parent_id or "",
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+    }
+
+
+class SpanExporter:
+    # spans are handed to a daemon thread so hot paths never block on file or network I/O
+    def __init__(self, path: str, endpoint: str):
+        self.path = path
+        self.endpoint = endpoint
+        self.enabled = bool(path or endpoint)
+        self._queue: queue.Queue[Span] = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        if not self.enabled:
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + TRACE_FLUSH_INTERVAL
+            while len(batch) < TRACE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"span export failed: {e}")
+
+    def _write(self, batch: list[Span]):
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for span in batch:
+                    f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        if self.endpoint:
+            body = {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                            ]
+                        },
+                        "scopeSpans": [
+                            {"scope": {"name": "internet-market"}, "spans": [_otlp_span(s) for s in batch]}
+                        ],
+                    }
+                ]
+            }
+            request = urllib.request.Request(
+                self.endpoint,
+                data=json.dumps(body).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+
+
+exporter = SpanExporter(TRACE_FILE, TRACE_OTLP_ENDPOINT)
@@ -0,0 +1,116 @@
+import os
+import re
+
+import httpx
+
+ORDERS_BASE = os.getenv("ORDERS_BASE", "http://orders-api:8000")
+PAYMENTS_BASE = os.getenv("PAYMENTS_BASE", "http://payments-api:8000")
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "0") == "1"
+
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "host",
+}
+
+# (method, path pattern, read timeout) overrides on top of the upstream defaults
+ROUTE_TIMEOUTS: dict[str, list[tuple[str, re.Pattern, float]]] = {
+    "orders": [
+        ("GET", re.compile(r"^orders/?$"), 30.0),
+        ("GET", re.compile(r"^orders/export$"), 300.0),
+        ("POST", re.compile(r"^orders/batch$"), 60.0),
+    ],
+    "payments": [
+        ("GET", re.compile(r"^accounts/?$"), 30.0),
+        ("GET", re.compile(r"^accounts/export$"), 300.0),
+    ],
+}
+
+# bounded route labels for proxied requests; anything else is "<upstream>/other"
+ROUTE_TEMPLATES: dict[str, list[tuple[re.Pattern, str]]] = {
+    "orders": [
+        (re.compile(r"^orders/?$"), "orders"),
+        (re.compile(r"^orders/batch$"), "orders/batch"),
+        (re.compile(r"^orders/export$"), "orders/export"),
+        (re.compile(r"^orders/\d+$"), "orders/{id}"),
+    ],
+    "payments": [
+        (re.compile(r"^accounts/?$"), "accounts"),
+        (re.compile(r"^accounts/topup$"), "accounts/topup"),
+        (re.compile(r"^accounts/export$"), "accounts/export"),
+        (re.compile(r"^accounts/\d+/balance$"), "accounts/{user_id}/balance"),
+    ],
+}
+
+# set by the gateway's own server on the way out
+SERVER_HEADERS = {"server", "date"}
+
+
+def forward_headers(headers) -> dict[str, str]:
+    return {k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
+
+def response_headers(headers) -> dict[str, str]:
+    return {k: v for k, v in forward_headers(headers).items() if k.lower() not in SERVER_HEADERS}
+
+
+class Upstream:
+    def __init__(self, name: str, base_url: str):
+        prefix = name.upper()
+        self.name = name
+        self.base_url = base_url
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv(f"{prefix}_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv(f"{prefix}_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv(f"{prefix}_KEEPALIVE_EXPIRY", "30")),
+        )
+        self.timeout = httpx.Timeout(
+            connect=float(os.getenv(f"{prefix}_CONNECT_TIMEOUT", "2")),
+            read=float(os.getenv(f"{prefix}_READ_TIMEOUT", "10")),
+            write=float(os.getenv(f"{prefix}_WRITE_TIMEOUT", "10")),
+            pool=float(os.getenv(f"{prefix}_POOL_TIMEOUT", "2")),
+        )
+        self.routes = ROUTE_TIMEOUTS.get(name, [])
+        self.templates = ROUTE_TEMPLATES.get(name, [])
+        self.client: httpx.AsyncClient | None = None
+
+    def timeout_for(self, method: str, path: str) -> httpx.Timeout:
+        for route_method, pattern, read in self.routes:
+            if route_method == method and pattern.match(path):
+                return httpx.Timeout(
+                    connect=self.timeout.connect,
+                    read=read,
+                    write=self.timeout.write,
+                    pool=self.timeout.pool,
+                )
+        return self.timeout
+
+    def route_template(self, path: str) -> str:
+        for pattern, template in self.templates:
+            if pattern.match(path):
+                return template
+        return f"{self.name}/other"
+
+    async def start(self):
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=UPSTREAM_HTTP2,
+            limits=self.limits,
+            timeout=self.timeout,
+        )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+orders = Upstream("orders", ORDERS_BASE)
+payments = Upstream("payments", PAYMENTS_BASE)
+upstreams = [orders, payments]
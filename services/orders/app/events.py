@@ -0,0 +1,104 @@
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import Any, ClassVar, TypeVar
+
+import msgpack
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+VERSION_HEADER = "x-event-version"
+
+EVENT_CODEC = os.getenv("EVENT_CODEC", "json")  # json | msgpack
+
+CODECS = {
+    "json": JSON_CONTENT_TYPE,
+    "msgpack": MSGPACK_CONTENT_TYPE,
+}
+
+if EVENT_CODEC not in CODECS:
+    raise ValueError(f"unknown EVENT_CODEC {EVENT_CODEC!r}, expected one of {sorted(CODECS)}")
+
+
+class EventDecodeError(ValueError):
+    pass
+
+
+class Event:
+    event_type: ClassVar[str]
+    version: ClassVar[int] = 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], version: int = 1):
+        if version > cls.version:
+            raise ValueError(f"{cls.event_type} v{version} is newer than supported v{cls.version}")
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+E = TypeVar("E", bound=Event)
+
+
+@dataclass(frozen=True, slots=True)
+class PaymentRequested(Event):
+    event_type: ClassVar[str] = "PaymentRequested"
+
+    message_id: str
+    order_id: int
+    user_id: int
+    amount: int
+
+
+@dataclass(frozen=True, slots=True)
+class PaymentResult(Event):
+    event_type: ClassVar[str] = "PaymentResult"
+
+    message_id: str
+    order_id: int
+    status: str
+    reason: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class OrderStatusChanged(Event):
+    event_type: ClassVar[str] = "OrderStatusChanged"
+
+    order_id: int
+    status: str
+    user_id: int | None = None
+
+
+EVENTS: dict[str, type[Event]] = {
+    cls.event_type: cls for cls in (PaymentRequested, PaymentResult, OrderStatusChanged)
+}
+
+
+def encode(event: Event, codec: str = EVENT_CODEC) -> tuple[bytes, str]:
+    data = event.to_dict()
+    if codec == "msgpack":
+        body = msgpack.packb(data)
+    else:
+        body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return body, CODECS[codec]
+
+
+def decode(body: bytes, content_type: str | None) -> dict[str, Any]:
+    if content_type == MSGPACK_CONTENT_TYPE:
+        return msgpack.unpackb(body)
+    # messages published before the codec layer carry plain JSON
+    return json.loads(body)
+
+
+def decode_message(message, cls: type[E]) -> E:
+    try:
+        version = int((message.headers or {}).get(VERSION_HEADER, 1))
+        return cls.from_dict(decode(message.body, message.content_type), version)
+    except Exception as e:
+        raise EventDecodeError(f"cannot decode {cls.event_type}: {e!r}") from e
+
+
+def load_event(event_type: str, payload: dict[str, Any]) -> Event:
+    return EVENTS[event_type].from_dict(payload)
@@ -1,23 +1,65 @@
-from fastapi import FastAPI, Depends, HTTPException
+import asyncio
+
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db import engine, Base, get_session
+from app.db import SessionLocal, get_session, pool_stats
 from app import models  # noqa: F401
-from app.schemas import CreateOrderRequest, OrderResponse
+from app.cache import TTLCache
+from app.metrics import metrics_middleware, metrics_response, track_db_pool
+from app.tracing import tracing_middleware
+from app.notify import ORDER_STATUS_CHANNEL, PgListener
+from app.schemas import (
+    BatchItemResult,
+    CreateOrderRequest,
+    CreateOrdersBatchRequest,
+    CreateOrdersBatchResponse,
+    OrderResponse,
+)
 from app.repository import OrdersRepository
 
 app = FastAPI(title="Orders Service", version="0.0.1")
-repo = OrdersRepository()
+app.middleware("http")(metrics_middleware)
+app.middleware("http")(tracing_middleware)
+track_db_pool(pool_stats)
+order_cache = TTLCache()
+repo = OrdersRepository(cache=order_cache)
+order_listener = PgListener(
+    ORDER_STATUS_CHANNEL,
+    on_notify=lambda payload: order_cache.invalidate(int(payload)),
+    on_connect=order_cache.enable,
+    on_disconnect=order_cache.disable,
+)
 
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    app.state.order_listener = asyncio.create_task(order_listener.run())
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.order_listener.cancel()
+    await order_listener.close()
 
 @app.get("/health")
 def health():
     return {"status": "ok", "service": "orders"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+
+def _order_response(order) -> OrderResponse:
+    return OrderResponse(
+        order_id=order.id,
+        user_id=order.user_id,
+        amount=order.amount,
+        status=order.status,
+    )
+
+
 @app.post("/orders", response_model=OrderResponse, status_code=201)
 async def create_order(
     req: CreateOrderRequest,
@@ -30,25 +72,73 @@ async def create_order(
             amount=req.amount,
             description=req.description,
         )
-    return OrderResponse(
-        order_id=order.id,
-        user_id=order.user_id,
-        amount=order.amount,
-        status=order.status,
+    return _order_response(order)
+
+
+@app.post("/orders/batch", response_model=CreateOrdersBatchResponse, status_code=201)
+async def create_orders_batch(
+    req: CreateOrdersBatchRequest,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+):
+    results: list[BatchItemResult] = []
+    valid: list[tuple[int, CreateOrderRequest]] = []
+    for index, item in enumerate(req.orders):
+        try:
+            valid.append((index, CreateOrderRequest.model_validate(item)))
+        except ValidationError as e:
+            results.append(
+                BatchItemResult(index=index, errors=e.errors(include_url=False, include_context=False))
+            )
+
+    if valid:
+        async with session.begin():
+            orders = await repo.create_orders(
+                session, [(o.user_id, o.amount, o.description) for _, o in valid]
+            )
+        results.extend(
+            BatchItemResult(index=index, order=_order_response(order))
+            for (index, _), order in zip(valid, orders)
+        )
+    else:
+        response.status_code = 422
+
+    results.sort(key=lambda r: r.index)
+    return CreateOrdersBatchResponse(
+        created=len(valid),
+        failed=len(req.orders) - len(valid),
+        results=results,
     )
 
+
 @app.get("/orders", response_model=list[OrderResponse])
-async def list_orders(session: AsyncSession = Depends(get_session)):
-    orders = await repo.list_orders(session)
-    return [
-        OrderResponse(
-            order_id=o.id,
-            user_id=o.user_id,
-            amount=o.amount,
-            status=o.status,
-        )
-        for o in orders
-    ]
+async def list_orders(
+    response: Response,
+    after_id: int | None = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    user_id: int | None = Query(None, gt=0),
+    status: str | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    orders = await repo.list_orders(
+        session, after_id=after_id, limit=limit, user_id=user_id, status=status
+    )
+    if len(orders) == limit:
+        response.headers["X-Next-After-Id"] = str(orders[-1].id)
+    return [_order_response(o) for o in orders]
+
+
+@app.get("/orders/export")
+async def export_orders(
+    user_id: int | None = Query(None, gt=0),
+    status: str | None = None,
+):
+    async def rows():
+        async with SessionLocal() as session:
+            async for order in repo.stream_orders(session, user_id=user_id, status=status):
+                yield _order_response(order).model_dump_json() + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
 
 
 @app.get("/orders/{order_id}", response_model=OrderResponse)
@@ -56,9 +146,4 @@ async def get_order(order_id: int, session: AsyncSession = Depends(get_session))
     order = await repo.get_order(session, order_id)
     if order is None:
         raise HTTPException(status_code=404, detail="Order not found")
-    return OrderResponse(
-        order_id=order.id,
-        user_id=order.user_id,
-        amount=order.amount,
-        status=order.status,
-    )
+    return _order_response(order)
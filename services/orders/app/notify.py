@@ -0,0 +1,83 @@
+import asyncio
+import os
+from typing import Callable
+
+import asyncpg
+
+from app.db import DATABASE_URL
+
+# LISTEN needs a session-level connection, so bypass a transaction-pooling PgBouncer here
+LISTEN_URL = os.getenv("DATABASE_LISTEN_URL", DATABASE_URL)
+ASYNCPG_DSN = LISTEN_URL.replace("postgresql+asyncpg://", "postgresql://")
+OUTBOX_CHANNEL = "outbox_inserted"
+LISTEN_CONNECT_TIMEOUT = float(os.getenv("LISTEN_CONNECT_TIMEOUT", "5"))
+
+ORDER_STATUS_CHANNEL = "order_status_changed"
+
+
+class PgListener:
+    def __init__(
+        self,
+        channel: str,
+        dsn: str = ASYNCPG_DSN,
+        on_notify: Callable[[str], None] | None = None,
+        on_connect: Callable[[], None] | None = None,
+        on_disconnect: Callable[[], None] | None = None,
+    ):
+        self.channel = channel
+        self.dsn = dsn
+        self.on_notify = on_notify
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self._connection: asyncpg.Connection | None = None
+        self._event = asyncio.Event()
+
+    @property
+    def listening(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self) -> bool:
+        try:
+            self._connection = await asyncpg.connect(self.dsn, timeout=LISTEN_CONNECT_TIMEOUT)
+            await self._connection.add_listener(self.channel, self._on_notify)
+            self._connection.add_termination_listener(self._on_terminate)
+        except Exception as e:
+            print(f"LISTEN {self.channel} unavailable: {e}")
+            await self.close()
+            return False
+        if self.on_connect is not None:
+            self.on_connect()
+        return True
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._event.set()
+        if self.on_notify is not None:
+            self.on_notify(payload)
+
+    def _on_terminate(self, connection):
+        if self.on_disconnect is not None:
+            self.on_disconnect()
+
+    async def run(self, retry_delay: float = 5.0):
+        while True:
+            if not self.listening:
+                await self.start()
+            await asyncio.sleep(retry_delay)
+
+    async def wait(self, timeout: float) -> bool:
+        # reconnecting is left to run(), so an outage degrades to plain polling
+        if not self.listening:
+            await asyncio.sleep(timeout)
+            return False
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+
+    async def close(self):
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
@@ -1,9 +1,19 @@
-from sqlalchemy import select
+from sqlalchemy import func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+from typing import AsyncIterator
 import uuid
+from app.cache import Cache
+from app.events import PaymentRequested
 from app.models import Order, Outbox
+from app.tracing import current_traceparent
+
+STREAM_CHUNK_SIZE = 1000
 
 class OrdersRepository:
+    def __init__(self, cache: Cache | None = None):
+        self.cache = cache
+
     async def create_order(
         self,
         session: AsyncSession,
@@ -19,25 +29,161 @@ class OrdersRepository:
         )
         session.add(order)
         await session.flush()
-        message_id = str(uuid.uuid4())
         event = Outbox(
-            event_type="PaymentRequested",
+            event_type=PaymentRequested.event_type,
             aggregate_id=order.id,
-            payload={
-                "message_id": message_id,
-                "order_id": order.id,
-                "user_id": user_id,
-                "amount": amount,
-            },
+            payload=PaymentRequested(
+                message_id=str(uuid.uuid4()),
+                order_id=order.id,
+                user_id=user_id,
+                amount=amount,
+            ).to_dict(),
+            trace_context=current_traceparent(),
         )
         session.add(event)
 
         return order
 
+    async def create_orders(
+        self,
+        session: AsyncSession,
+        items: list[tuple[int, int, str | None]],
+    ) -> list[Order]:
+        if not items:
+            return []
+        result = await session.scalars(
+            insert(Order).returning(Order, sort_by_parameter_order=True),
+            [
+                {"user_id": user_id, "amount": amount, "description": description, "status": "NEW"}
+                for user_id, amount, description in items
+            ],
+        )
+        orders = list(result)
+        trace_context = current_traceparent()
+        await session.execute(
+            insert(Outbox),
+            [
+                {
+                    "event_type": PaymentRequested.event_type,
+                    "aggregate_id": order.id,
+                    "payload": PaymentRequested(
+                        message_id=str(uuid.uuid4()),
+                        order_id=order.id,
+                        user_id=order.user_id,
+                        amount=order.amount,
+                    ).to_dict(),
+                    "trace_context": trace_context,
+                }
+                for order in orders
+            ],
+        )
+        return orders
+
     async def get_order(self, session: AsyncSession, order_id: int) -> Order | None:
+        if self.cache is None:
+            result = await session.execute(select(Order).where(Order.id == order_id))
+            return result.scalar_one_or_none()
+
+        order = self.cache.get(order_id)
+        if order is not None:
+            return order
+
+        generation = self.cache.generation()
         result = await session.execute(select(Order).where(Order.id == order_id))
-        return result.scalar_one_or_none()
+        order = result.scalar_one_or_none()
+        if order is not None:
+            session.expunge(order)
+            self.cache.set(order_id, order, generation)
+        return order
+
+    def _orders_query(self, user_id: int | None, status: str | None):
+        stmt = select(Order).order_by(Order.id)
+        if user_id is not None:
+            stmt = stmt.where(Order.user_id == user_id)
+        if status is not None:
+            stmt = stmt.where(Order.status == status)
+        return stmt
 
-    async def list_orders(self, session: AsyncSession) -> list[Order]:
-        result = await session.execute(select(Order))
+    async def list_orders(
+        self,
+        session: AsyncSession,
+        after_id: int | None = None,
+        limit: int = 100,
+        user_id: int | None = None,
+        status: str | None = None,
+    ) -> list[Order]:
+        stmt = self._orders_query(user_id, status)
+        if after_id is not None:
+            stmt = stmt.where(Order.id > after_id)
+        result = await session.execute(stmt.limit(limit))
         return list(result.scalars())
+
+    async def stream_orders(
+        self,
+        session: AsyncSession,
+        user_id: int | None = None,
+        status: str | None = None,
+    ) -> AsyncIterator[Order]:
+        stmt = self._orders_query(user_id, status).execution_options(yield_per=STREAM_CHUNK_SIZE)
+        result = await session.stream_scalars(stmt)
+        async for order in result:
+            yield order
+
+
+class OutboxRepository:
+    async def claim_batch(
+        self,
+        session: AsyncSession,
+        relay_id: str,
+        limit: int,
+        lease_seconds: int,
+    ) -> list[Outbox]:
+        candidates = (
+            select(Outbox.id)
+            .where(
+                Outbox.published_at.is_(None),
+                or_(Outbox.claimed_until.is_(None), Outbox.claimed_until < func.now()),
+            )
+            .order_by(Outbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            update(Outbox)
+            .where(Outbox.id.in_(candidates))
+            .values(
+                claimed_by=relay_id,
+                claimed_until=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(Outbox)
+            .execution_options(synchronize_session=False)
+        )
+        return sorted(result.scalars(), key=lambda ev: ev.id)
+
+    async def backlog(self, session: AsyncSession) -> tuple[int, float]:
+        res = await session.execute(
+            select(
+                func.count(),
+                func.extract("epoch", func.localtimestamp() - func.min(Outbox.created_at)),
+            ).where(Outbox.published_at.is_(None))
+        )
+        count, lag = res.one()
+        return count, float(lag or 0)
+
+    async def mark_published(self, session: AsyncSession, relay_id: str, ids: list[int]):
+        if not ids:
+            return
+        await session.execute(
+            update(Outbox)
+            .where(Outbox.id.in_(ids), Outbox.claimed_by == relay_id)
+            .values(published_at=func.now(), claimed_until=None)
+        )
+
+    async def release(self, session: AsyncSession, relay_id: str, ids: list[int]):
+        if not ids:
+            return
+        await session.execute(
+            update(Outbox)
+            .where(Outbox.id.in_(ids), Outbox.claimed_by == relay_id)
+            .values(claimed_by=None, claimed_until=None)
+        )
@@ -1,3 +1,5 @@
+from typing import Any
+
 from pydantic import BaseModel, Field
 
 class CreateOrderRequest(BaseModel):
@@ -10,3 +12,16 @@ class OrderResponse(BaseModel):
     user_id: int
     amount: int
     status: str
+
+class CreateOrdersBatchRequest(BaseModel):
+    orders: list[dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+
+class BatchItemResult(BaseModel):
+    index: int
+    order: OrderResponse | None = None
+    errors: list[dict[str, Any]] | None = None
+
+class CreateOrdersBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BatchItemResult]
@@ -0,0 +1,53 @@
+"""jsonb payloads and lookup indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+PAYLOAD_TABLES = ("outbox", "inbox", "outbox_archive", "inbox_archive")
+
+
+def upgrade():
+    for table in PAYLOAD_TABLES:
+        op.alter_column(
+            table,
+            "payload",
+            type_=postgresql.JSONB(),
+            postgresql_using="payload::jsonb",
+        )
+
+    op.create_index("ix_outbox_event_type_aggregate_id", "outbox", ["event_type", "aggregate_id"])
+    op.create_index(
+        "ix_outbox_archive_event_type_aggregate_id",
+        "outbox_archive",
+        ["event_type", "aggregate_id"],
+    )
+    op.create_index("ix_inbox_payload_order_id", "inbox", [sa.text("(payload->>'order_id')")])
+    op.create_index(
+        "ix_inbox_archive_payload_order_id",
+        "inbox_archive",
+        [sa.text("(payload->>'order_id')")],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_inbox_archive_payload_order_id", table_name="inbox_archive")
+    op.drop_index("ix_inbox_payload_order_id", table_name="inbox")
+    op.drop_index("ix_outbox_archive_event_type_aggregate_id", table_name="outbox_archive")
+    op.drop_index("ix_outbox_event_type_aggregate_id", table_name="outbox")
+    for table in PAYLOAD_TABLES:
+        op.alter_column(
+            table,
+            "payload",
+            type_=sa.JSON(),
+            postgresql_using="payload::json",
+        )
@@ -0,0 +1,21 @@
+"""outbox trace context
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("outbox", sa.Column("trace_context", sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("outbox", "trace_context")
@@ -0,0 +1,32 @@
+"""not null timestamps
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# 0001 used to create these as nullable, unlike the models and create_all
+TIMESTAMP_COLUMNS = [
+    ("orders", "created_at"),
+    ("orders", "updated_at"),
+    ("outbox", "created_at"),
+    ("inbox", "received_at"),
+]
+
+
+def upgrade():
+    for table, column in TIMESTAMP_COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = now() WHERE {column} IS NULL")
+        op.alter_column(table, column, existing_type=sa.TIMESTAMP(), nullable=False)
+
+
+def downgrade():
+    # 0001 now creates them NOT NULL as well
+    pass
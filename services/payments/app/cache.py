@@ -0,0 +1,71 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Protocol
+
+CACHE_TTL = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_SIZE = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+
+class Cache(Protocol):
+    def generation(self) -> int: ...
+
+    def get(self, key: Hashable) -> Any | None: ...
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None): ...
+
+    def invalidate(self, key: Hashable): ...
+
+    def enable(self): ...
+
+    def disable(self): ...
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = False
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._generation = 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> Any | None:
+        if not self.enabled:
+            return None
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None):
+        # a fill that raced with an invalidation would put a stale value back
+        if not self.enabled or (generation is not None and generation != self._generation):
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._generation += 1
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._generation += 1
+        self._data.clear()
+
+    def enable(self):
+        self.clear()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.clear()
@@ -1,20 +1,42 @@
-from fastapi import FastAPI, Depends, HTTPException
+import asyncio
+
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import engine, Base, get_session
+from app.db import SessionLocal, get_session, pool_stats
 from app import models  # noqa: F401
+from app.cache import TTLCache
+from app.metrics import metrics_middleware, metrics_response, track_db_pool
+from app.tracing import tracing_middleware
+from app.notify import ACCOUNT_BALANCE_CHANNEL, PgListener
 from app.schemas import CreateAccountRequest, TopUpRequest, AccountResponse
 
 from app.repository import AccountsRepository
 
 app = FastAPI(title="Payments Service", version="0.0.1")
-repo = AccountsRepository()
+app.middleware("http")(metrics_middleware)
+app.middleware("http")(tracing_middleware)
+track_db_pool(pool_stats)
+account_cache = TTLCache()
+repo = AccountsRepository(cache=account_cache)
+account_listener = PgListener(
+    ACCOUNT_BALANCE_CHANNEL,
+    on_notify=lambda payload: account_cache.invalidate(int(payload)),
+    on_connect=account_cache.enable,
+    on_disconnect=account_cache.disable,
+)
 
 
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    app.state.account_listener = asyncio.create_task(account_listener.run())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.account_listener.cancel()
+    await account_listener.close()
 
 
 @app.get("/health")
@@ -22,6 +44,12 @@ def health():
     return {"status": "ok", "service": "payments"}
 
 
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+
 @app.post("/accounts", response_model=AccountResponse, status_code=201)
 async def create_account(
     req: CreateAccountRequest,
@@ -44,6 +72,7 @@ async def topup(
     try:
         async with session.begin():
             new_balance = await repo.topup(session, req.user_id, req.amount)
+        account_cache.invalidate(req.user_id)
         return AccountResponse(user_id=req.user_id, balance=new_balance)
     except ValueError as e:
         if str(e) == "ACCOUNT_NOT_FOUND":
@@ -63,6 +92,23 @@ async def get_balance(
     return AccountResponse(user_id=acc.user_id, balance=acc.balance)
 
 @app.get("/accounts", response_model=list[AccountResponse])
-async def list_accounts(session: AsyncSession = Depends(get_session)):
-    accounts = await repo.list_accounts(session)
-    return [AccountResponse(user_id=a.user_id, balance=a.balance) for a in accounts]
\ No newline at end of file
+async def list_accounts(
+    response: Response,
+    after_user_id: int | None = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+):
+    accounts = await repo.list_accounts(session, after_user_id=after_user_id, limit=limit)
+    if len(accounts) == limit:
+        response.headers["X-Next-After-User-Id"] = str(accounts[-1].user_id)
+    return [AccountResponse(user_id=a.user_id, balance=a.balance) for a in accounts]
+
+
+@app.get("/accounts/export")
+async def export_accounts():
+    async def rows():
+        async with SessionLocal() as session:
+            async for a in repo.stream_accounts(session):
+                yield AccountResponse(user_id=a.user_id, balance=a.balance).model_dump_json() + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
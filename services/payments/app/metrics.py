@@ -0,0 +1,123 @@
+import os
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.requests import Request
+from starlette.responses import Response
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+# set for servers with several uvicorn workers, so that /metrics sums all of them
+# whichever worker answers the scrape; prometheus_client reads it on import
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to response headers, by route template",
+    ["method", "route", "status"],
+)
+OUTBOX_BACKLOG = Gauge(
+    "outbox_backlog", "Unpublished outbox rows", ["relay"], multiprocess_mode="livemax"
+)
+OUTBOX_LAG = Gauge(
+    "outbox_lag_seconds",
+    "Age of the oldest unpublished outbox row",
+    ["relay"],
+    multiprocess_mode="livemax",
+)
+OUTBOX_PUBLISHED = Counter("outbox_published", "Outbox events confirmed by the broker", ["relay"])
+RELAY_BATCH_SIZE = Histogram(
+    "outbox_relay_batch_size",
+    "Events claimed per relay round",
+    ["relay"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+RELAY_PUBLISH_SECONDS = Histogram(
+    "outbox_relay_publish_seconds", "Time to publish and confirm one claimed batch", ["relay"]
+)
+CONSUMER_SECONDS = Histogram(
+    "consumer_processing_seconds", "Handler time per message or batch", ["queue"]
+)
+CONSUMER_BATCH_SIZE = Histogram(
+    "consumer_batch_size",
+    "Messages handled per batch",
+    ["queue"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+CONSUMER_MESSAGES = Counter(
+    "consumer_messages", "Consumed messages by outcome", ["queue", "outcome"]
+)
+WS_CONNECTIONS = Gauge(
+    "websocket_connections", "Open push connections", ["endpoint"], multiprocess_mode="livesum"
+)
+
+_collectors: list = []
+
+
+class PoolCollector:
+    def __init__(self, stats: Callable[[], dict[str, float]]):
+        self.stats = stats
+
+    def collect(self):
+        stats = self.stats()
+        for name in ("size", "checked_out", "checked_in", "overflow", "wait_seconds_max"):
+            yield GaugeMetricFamily(f"db_pool_{name}", f"Connection pool {name}", value=stats[name])
+        yield CounterMetricFamily("db_pool_checkouts", "Pool checkouts", value=stats["wait_count"])
+        yield CounterMetricFamily(
+            "db_pool_wait_seconds", "Time spent waiting for a connection", value=stats["wait_seconds_total"]
+        )
+
+
+def track_db_pool(stats: Callable[[], dict[str, float]]):
+    collector = PoolCollector(stats)
+    REGISTRY.register(collector)
+    _collectors.append(collector)
+
+
+async def metrics_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # catch-all proxy routes name the upstream route they matched instead
+        route = getattr(request.state, "route_template", None)
+        if route is None:
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+        REQUEST_LATENCY.labels(request.method, route, str(status)).observe(
+            time.perf_counter() - start
+        )
+
+
+def metrics_response() -> Response:
+    if not MULTIPROC_DIR:
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # pool stats live in process memory, so they describe the answering worker only
+    for collector in _collectors:
+        registry.register(collector)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_dead():
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def start_metrics_server(port: int = METRICS_PORT):
+    start_http_server(port)
+    print(f"metrics listening on :{port}")
@@ -1,4 +1,5 @@
-from sqlalchemy import BigInteger, Text, JSON, TIMESTAMP, func
+from sqlalchemy import BigInteger, Index, Text, TIMESTAMP, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 
@@ -20,10 +21,14 @@ class Account(Base):
 
 class Inbox(Base):
     __tablename__ = "inbox"
+    __table_args__ = (
+        Index("ix_inbox_received_at", "received_at"),
+        Index("ix_inbox_payload_order_id", text("(payload->>'order_id')")),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     message_id: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
-    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
     received_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=func.now()
     )
@@ -45,14 +50,62 @@ class PaymentTransaction(Base):
 
 class Outbox(Base):
     __tablename__ = "outbox"
+    __table_args__ = (
+        Index("ix_outbox_unpublished", "id", postgresql_where=text("published_at IS NULL")),
+        Index(
+            "ix_outbox_published_at",
+            "published_at",
+            postgresql_where=text("published_at IS NOT NULL"),
+        ),
+        Index("ix_outbox_event_type_aggregate_id", "event_type", "aggregate_id"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     event_type: Mapped[str] = mapped_column(Text, nullable=False)
     aggregate_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
-    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP, server_default=func.now()
     )
     published_at: Mapped[datetime | None] = mapped_column(
         TIMESTAMP, nullable=True
     )
+    claimed_by: Mapped[str | None] = mapped_column(Text, nullable=True)
+    claimed_until: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP, nullable=True
+    )
+    trace_context: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class OutboxArchive(Base):
+    __tablename__ = "outbox_archive"
+    __table_args__ = (
+        Index("ix_outbox_archive_event_type_aggregate_id", "event_type", "aggregate_id"),
+        {"postgresql_partition_by": "RANGE (archived_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    event_type: Mapped[str] = mapped_column(Text, nullable=False)
+    aggregate_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime | None] = mapped_column(TIMESTAMP)
+    published_at: Mapped[datetime | None] = mapped_column(TIMESTAMP)
+    archived_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, primary_key=True, server_default=func.now()
+    )
+
+
+class InboxArchive(Base):
+    __tablename__ = "inbox_archive"
+    __table_args__ = (
+        Index("ix_inbox_archive_payload_order_id", text("(payload->>'order_id')")),
+        {"postgresql_partition_by": "RANGE (archived_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    message_id: Mapped[str] = mapped_column(Text, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    received_at: Mapped[datetime | None] = mapped_column(TIMESTAMP)
+    archived_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP, primary_key=True, server_default=func.now()
+    )
@@ -1,11 +1,19 @@
-from sqlalchemy import select
+from datetime import timedelta
+from typing import AsyncIterator
+
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import update
 
-from app.models import Account
+from app.cache import Cache
+from app.models import Account, Outbox
+
+STREAM_CHUNK_SIZE = 1000
 
 
 class AccountsRepository:
+    def __init__(self, cache: Cache | None = None):
+        self.cache = cache
+
     async def create_account(self, session: AsyncSession, user_id: int) -> Account:
         result = await session.execute(select(Account).where(Account.user_id == user_id))
         existing = result.scalar_one_or_none()
@@ -19,8 +27,21 @@ class AccountsRepository:
         return acc
 
     async def get_account(self, session: AsyncSession, user_id: int) -> Account | None:
+        if self.cache is None:
+            result = await session.execute(select(Account).where(Account.user_id == user_id))
+            return result.scalar_one_or_none()
+
+        acc = self.cache.get(user_id)
+        if acc is not None:
+            return acc
+
+        generation = self.cache.generation()
         result = await session.execute(select(Account).where(Account.user_id == user_id))
-        return result.scalar_one_or_none()
+        acc = result.scalar_one_or_none()
+        if acc is not None:
+            session.expunge(acc)
+            self.cache.set(user_id, acc, generation)
+        return acc
 
     async def topup(self, session: AsyncSession, user_id: int, amount: int) -> int:
         stmt = (
@@ -35,7 +56,83 @@ class AccountsRepository:
             raise ValueError("ACCOUNT_NOT_FOUND")
         return int(new_balance)
 
-    async def list_accounts(self, session: AsyncSession) -> list[Account]:
-        result = await session.execute(select(Account).order_by(Account.user_id))
+    async def list_accounts(
+        self,
+        session: AsyncSession,
+        after_user_id: int | None = None,
+        limit: int = 100,
+    ) -> list[Account]:
+        stmt = select(Account).order_by(Account.user_id)
+        if after_user_id is not None:
+            stmt = stmt.where(Account.user_id > after_user_id)
+        result = await session.execute(stmt.limit(limit))
         return list(result.scalars())
 
+    async def stream_accounts(self, session: AsyncSession) -> AsyncIterator[Account]:
+        stmt = (
+            select(Account)
+            .order_by(Account.user_id)
+            .execution_options(yield_per=STREAM_CHUNK_SIZE)
+        )
+        result = await session.stream_scalars(stmt)
+        async for account in result:
+            yield account
+
+
+class OutboxRepository:
+    async def claim_batch(
+        self,
+        session: AsyncSession,
+        relay_id: str,
+        limit: int,
+        lease_seconds: int,
+    ) -> list[Outbox]:
+        candidates = (
+            select(Outbox.id)
+            .where(
+                Outbox.published_at.is_(None),
+                or_(Outbox.claimed_until.is_(None), Outbox.claimed_until < func.now()),
+            )
+            .order_by(Outbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            update(Outbox)
+            .where(Outbox.id.in_(candidates))
+            .values(
+                claimed_by=relay_id,
+                claimed_until=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(Outbox)
+            .execution_options(synchronize_session=False)
+        )
+        return sorted(result.scalars(), key=lambda ev: ev.id)
+
+    async def backlog(self, session: AsyncSession) -> tuple[int, float]:
+        res = await session.execute(
+            select(
+                func.count(),
+                func.extract("epoch", func.localtimestamp() - func.min(Outbox.created_at)),
+            ).where(Outbox.published_at.is_(None))
+        )
+        count, lag = res.one()
+        return count, float(lag or 0)
+
+    async def mark_published(self, session: AsyncSession, relay_id: str, ids: list[int]):
+        if not ids:
+            return
+        await session.execute(
+            update(Outbox)
+            .where(Outbox.id.in_(ids), Outbox.claimed_by == relay_id)
+            .values(published_at=func.now(), claimed_until=None)
+        )
+
+    async def release(self, session: AsyncSession, relay_id: str, ids: list[int]):
+        if not ids:
+            return
+        await session.execute(
+            update(Outbox)
+            .where(Outbox.id.in_(ids), Outbox.claimed_by == relay_id)
+            .values(claimed_by=None, claimed_until=None)
+        )
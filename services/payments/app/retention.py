@@ -0,0 +1,115 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from app.db import SessionLocal
+from app.models import Inbox, InboxArchive, Outbox, OutboxArchive
+
+RETENTION_MODE = os.getenv("RETENTION_MODE", "delete")  # delete | archive | off
+OUTBOX_RETENTION_HOURS = int(os.getenv("OUTBOX_RETENTION_HOURS", "24"))
+INBOX_RETENTION_DAYS = int(os.getenv("INBOX_RETENTION_DAYS", "7"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL_SECONDS", "60"))
+RETENTION_BATCH_PAUSE = 0.1
+
+OUTBOX_ARCHIVE_COLUMNS = ["id", "event_type", "aggregate_id", "payload", "created_at", "published_at"]
+INBOX_ARCHIVE_COLUMNS = ["id", "message_id", "payload", "received_at"]
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+async def ensure_archive_partitions(now: datetime):
+    this_month = _month_start(now)
+    next_month = _month_start(this_month + timedelta(days=32))
+    after_next = _month_start(next_month + timedelta(days=32))
+
+    async with SessionLocal() as session:
+        async with session.begin():
+            for table in (OutboxArchive.__tablename__, InboxArchive.__tablename__):
+                for start, end in ((this_month, next_month), (next_month, after_next)):
+                    await session.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} "
+                            f"PARTITION OF {table} "
+                            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+                        )
+                    )
+
+
+async def _prune_batch(model, archive_model, columns: list[str], condition) -> int:
+    candidates = (
+        select(model.id)
+        .where(condition)
+        .order_by(model.id)
+        .limit(RETENTION_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    removed = (
+        delete(model)
+        .where(model.id.in_(candidates))
+        .returning(*(model.__table__.c[name] for name in columns))
+    )
+
+    async with SessionLocal() as session:
+        async with session.begin():
+            if RETENTION_MODE == "archive":
+                moved = removed.cte("moved")
+                stmt = (
+                    insert(archive_model)
+                    .from_select(columns, select(*(moved.c[name] for name in columns)))
+                    .returning(archive_model.id)
+                )
+            else:
+                stmt = removed
+            result = await session.execute(stmt)
+            return len(result.all())
+
+
+async def _prune(model, archive_model, columns: list[str], condition) -> int:
+    total = 0
+    while True:
+        n = await _prune_batch(model, archive_model, columns, condition)
+        total += n
+        if n < RETENTION_BATCH_SIZE:
+            return total
+        await asyncio.sleep(RETENTION_BATCH_PAUSE)
+
+
+async def retention_once() -> tuple[int, int]:
+    if RETENTION_MODE == "archive":
+        await ensure_archive_partitions(datetime.utcnow())
+
+    outbox_cutoff = func.now() - timedelta(hours=OUTBOX_RETENTION_HOURS)
+    inbox_cutoff = func.now() - timedelta(days=INBOX_RETENTION_DAYS)
+
+    outbox_n = await _prune(
+        Outbox,
+        OutboxArchive,
+        OUTBOX_ARCHIVE_COLUMNS,
+        Outbox.published_at < outbox_cutoff,
+    )
+    inbox_n = await _prune(
+        Inbox,
+        InboxArchive,
+        INBOX_ARCHIVE_COLUMNS,
+        Inbox.received_at < inbox_cutoff,
+    )
+    return outbox_n, inbox_n
+
+
+async def run_retention():
+    if RETENTION_MODE == "off":
+        return
+    print(f"retention job started, mode={RETENTION_MODE}")
+    while True:
+        try:
+            outbox_n, inbox_n = await retention_once()
+            if outbox_n or inbox_n:
+                print(f"retention: outbox={outbox_n} inbox={inbox_n} ({RETENTION_MODE})")
+        except Exception as e:
+            print(f"retention error: {e}")
+        await asyncio.sleep(RETENTION_INTERVAL)
@@ -0,0 +1,146 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+NOTIFY_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION outbox_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('outbox_inserted', '');
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS outbox_notify ON outbox",
+    """
+    CREATE TRIGGER outbox_notify AFTER INSERT ON outbox
+    FOR EACH STATEMENT EXECUTE FUNCTION outbox_notify()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION account_balance_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('account_balance_changed', CAST(NEW.user_id AS text));
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS account_balance_notify ON accounts",
+    """
+    CREATE TRIGGER account_balance_notify AFTER UPDATE OF balance ON accounts
+    FOR EACH ROW WHEN (OLD.balance IS DISTINCT FROM NEW.balance)
+    EXECUTE FUNCTION account_balance_notify()
+    """,
+]
+
+
+# databases bootstrapped by the old create_all startup already have these tables,
+# possibly without columns added later (the outbox lease), which are added here
+def _create_table(name: str, *columns, **kw):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(name):
+        op.create_table(name, *columns, **kw)
+        return
+    existing = {column["name"] for column in inspector.get_columns(name)}
+    for column in columns:
+        if isinstance(column, sa.Column) and column.name not in existing:
+            op.add_column(name, column)
+
+
+def upgrade():
+    _create_table(
+        "accounts",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("user_id", sa.BigInteger(), nullable=False, unique=True),
+        sa.Column("balance", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+    )
+
+    _create_table(
+        "payment_transactions",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("order_id", sa.BigInteger(), nullable=False, unique=True),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("reason", sa.Text()),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+    )
+
+    _create_table(
+        "outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("event_type", sa.Text(), nullable=False),
+        sa.Column("aggregate_id", sa.BigInteger(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+        sa.Column("published_at", sa.TIMESTAMP(), nullable=True),
+        sa.Column("claimed_by", sa.Text(), nullable=True),
+        sa.Column("claimed_until", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_index(
+        "ix_outbox_unpublished",
+        "outbox",
+        ["id"],
+        postgresql_where=sa.text("published_at IS NULL"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_outbox_published_at",
+        "outbox",
+        ["published_at"],
+        postgresql_where=sa.text("published_at IS NOT NULL"),
+        if_not_exists=True,
+    )
+
+    _create_table(
+        "inbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("message_id", sa.Text(), nullable=False, unique=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("received_at", sa.TIMESTAMP(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_inbox_received_at", "inbox", ["received_at"], if_not_exists=True)
+
+    _create_table(
+        "outbox_archive",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("event_type", sa.Text(), nullable=False),
+        sa.Column("aggregate_id", sa.BigInteger(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP()),
+        sa.Column("published_at", sa.TIMESTAMP()),
+        sa.Column("archived_at", sa.TIMESTAMP(), primary_key=True, server_default=sa.func.now()),
+        postgresql_partition_by="RANGE (archived_at)",
+    )
+    _create_table(
+        "inbox_archive",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column("message_id", sa.Text(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("received_at", sa.TIMESTAMP()),
+        sa.Column("archived_at", sa.TIMESTAMP(), primary_key=True, server_default=sa.func.now()),
+        postgresql_partition_by="RANGE (archived_at)",
+    )
+
+    for ddl in NOTIFY_DDL:
+        op.execute(ddl)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS account_balance_notify ON accounts")
+    op.execute("DROP TRIGGER IF EXISTS outbox_notify ON outbox")
+    op.execute("DROP FUNCTION IF EXISTS account_balance_notify()")
+    op.execute("DROP FUNCTION IF EXISTS outbox_notify()")
+    for table in ("inbox_archive", "outbox_archive", "outbox", "payment_transactions", "inbox", "accounts"):
+        op.drop_table(table)